@@ -478,6 +478,21 @@ defining a complex macro or investigating a suspicious calculation result.
       Exec: @dist
 
     y = 5.0     
+
+### Macro Optimization
+
+`opt` turns on an optimizer for macro bodies.  Runs of plain numbers and
+arithmetic are computed once and pushed as a single value, and a few common
+pairs are fused (`d *` becomes a square, `s s` and `d y` just check the
+stack).  Results are the same as running the macro as written.  With `debug`
+on as well, `l:m` shows the optimized form next to each macro:
+
+    |> m:area $r d * $pi * 2 3 *
+    |> opt debug l:m
+    area            |  $r d * $pi * 2 3 *  =>  $r (d *) $pi * 6.0
+
+Variables are read when the macro runs, so `$pi 2 *` is not folded.
+Use `noopt` to turn it off again.
 """
 
 DOCS['Exiting'] = """
@@ -561,6 +576,20 @@ ensure that the macro's stack it the one preserved.
     y = 9.0    
 
 
+#### Fast macros
+
+Macros that only use numbers, `$var` reads, arithmetic, `sqrt`, `log`, trig and
+the `s`, `d` and `y` stack operations are translated to Python when they are
+defined and run several times faster.  Anything else (mode changes, setting
+variables, conditionals) runs through the normal interpreter, as does every
+macro while `debug` is on so that each step can be shown.
+
+How much faster depends on the macro's length.  A call still has the same
+setup as any other macro, and values are still Python numbers that are checked
+after every step (a result such as `-1 sqrt` can turn complex), so a three step
+macro runs about 3 times faster, while a twenty step one runs about 7 times
+faster, or about 10 times inside a `times:` loop.
+
 ### Conditionals
 
 Conditionals return 1 or 0.  If `rpncalc` is not in mixed mode, these will
@@ -589,11 +618,113 @@ whether the argument is a integer or a float.  Here is an example for clarity:
     y = 1234           
     
     |mix|> D 0.0 ?foo
+
+### Recursion
+
+A macro can call itself, usually behind a conditional.  Macro calls do not use
+up Python stack, so there is no depth limit other than memory, and a call that
+is the last thing a macro does replaces the running macro instead of nesting
+inside it.  This countdown runs in constant memory for any starting value:
+
+    |> m:countdown 1 - d ?countdown
+
+    |> 100000 @countdown
+    y = 0.0
+
+### Loops
+
+For loops that do not need a custom exit test, the loop words are simpler and
+faster than a recursive macro.  They run the whole loop with one variable scope,
+so, as with `@name`, variables set inside the loop are gone afterward.
+
+  - `y times:name` runs the macro y times.
+  - `while:name` pops y and runs the macro if it is non-zero, then pops
+    y again after each pass.
+  - `x y for:name` runs the macro once for each integer from x up to (but not
+    including) y, with that integer pushed on the stack first.
+
+Here is the sum of 1 through 100:
+
+    |> m:add +
+
+    |> 0 1 101 for:add
+    y = 5050.0
+
+### Map, Filter and Reduce
+
+These run a macro, or any single command, over the whole stack in one go:
+
+  - `map:name` runs it on each value by itself, and replaces the value with
+    whatever it leaves.
+  - `filter:name` keeps only the values that it turns into something
+    non-zero.
+  - `reduce:name` runs it on the first two values, then on that result and
+    the third value, and so on, until one value is left.  Any operator
+    works, as in `reduce:+` or `reduce:*`.
+
+If the macro fails on any value, the stack is left as it was.
+
+    |> m:twice 2 *
+
+    |> 1 2 3 4 map:twice
+    2.0  4.0
+    x = 6.0
+    y = 8.0
+
+    |> reduce:+
+    y = 20.0
+
+For a slow macro over a large stack, `pmap:name` works like `map:name`, but
+splits the stack across worker processes, one per CPU unless `pworkers` has
+set another count (such as `4 pworkers`).  Each worker starts with the same
+variables, macros and modes.  Stacks of fewer than 4096 values are simply run
+with `map:`, as starting the workers would cost more than it saves.  If the
+macro fails on any values, each is reported by its place on the stack (such as
+`s3` for the third from the top), and the stack is left as it was.
+
+### Solve, Integrate and Minimize
+
+These treat a macro (or a single command) as a function f(x), run on x alone
+as with `map:`, and work over the range from y to x, which they replace with
+the answer:
+
+  - `solve:name` finds where f(x) is zero.  f(y) and f(x) must differ in
+    sign.
+  - `integrate:name` integrates f(x).
+  - `minimize:name` finds where f(x) is least.  If it has several minima,
+    any one of them may be found.
+
+    |> m:f sq 2 -
+
+    |> 0 2 solve:f
+    y = 1.4142135623731364
+
+    |> 0 $pi integrate:sin
+    x = 1.4142135623731364
+    y = 2.0
+
+Answers are found to about 10 decimal places.  `integrate:` tries its macro
+on a vector of all the points it needs at once, which is much faster, and
+only runs it on each point by itself if that fails (as it will for a macro
+using conditionals, say).  No point is computed twice, and in `debug` mode
+each command reports its iterations and how many points it computed.
 """
 
 DOCS['Misc'] = """
 Miscellaneous functions include showing help, and sourcing files that contain
 commands.
+
+`i:<path>` loads a file of data much faster than `s:<path>`.  Lines of plain
+numbers are read in bulk, a megabyte at a time, while any other line runs as
+it would with `s:`.  In `mix` mode every line runs as it would with `s:`, so
+that integers stay integers.  `csv:<path>` pushes every numeric field of a
+comma separated file, row by row, as floating point values, and skips the rest
+(such as a header row).  Both
+read gzipped files as they are, and `-` for the path reads standard input.
+While an accumulator is on (see `acc:`), the values are folded into it as they
+are read, just as `s:` would fold each line.  They report how many values were
+read per second in `debug` mode, and interactively when a load takes a second
+or more.
 """
 
 DOCS['Numbers'] = """
@@ -620,8 +751,34 @@ but would see on a "scientific" one.
 
 DOCS['Stack Management'] = """
 This section lists basic stack management functions.  Note that the "Clipboard"
-operations (especially pc, px, and pv) are intended to augment the ones listed 
+operations (especially pc, px, and pv) are intended to augment the ones listed
 below for more advanced stack manipulations.
+
+The stack can hold millions of values.  Once it passes 65536 entries, the
+floating point values below the top 4096 are packed at 8 bytes each, which is
+about a quarter of the memory they would otherwise take.  This is automatic
+and makes no difference to how the stack behaves.
+
+For data sets too large for memory, `y spill` moves the packed values to a
+temporary file once they take more than y MB, along with the undo history
+for them.  The top of the stack stays in memory, so the usual operations are
+no slower, while whole stack operations like `sum`, `median` and `R` read the
+file back in blocks.  `nospill` brings everything back into memory.  The file
+is created in `$TMPDIR` (`/tmp` by default).
+
+To fill the stack with a sequence, use `range` (integers from x up to y-1),
+`frange` (a start, stop and step), `linspace` (a start, end and count, evenly
+spaced and including both ends), `logspace` (the same, as powers of 10) or
+`repeat` (x, y times).  They push all of their values at once, so millions of
+them take well under a second:
+
+    |> 0 1 5 linspace
+    0.0  0.25  0.5
+    x = 0.75
+    y = 1.0
+
+Each of them can make a vector instead, as `v:range`, `v:linspace` and so
+on.
 """
 
 DOCS['Statistics'] = """
@@ -640,6 +797,78 @@ function 'C', 'X' and 'V' can be useful for storeing and retrieving the stack.
       19.6675        
     V median
       36.0           
+
+The statistics functions replace the stack with their result.  Prefix one with
+`k:` to push the result on top of the stack instead, keeping the data for the
+next function:
+
+    |> 5 0.67 36 37 k:median
+    5.0  0.67  36.0
+    x = 37.0
+    y = 36.0
+
+`pct` pops y first, and finds that percentile of the rest of the stack.  It is
+the nearest value at or above that rank, so `50 pct` is the median, and the
+median of an even number of values is the upper of the two middle ones.  `var`
+and `stddev` are the sample variance and standard deviation.
+
+Sums of floating point values are exact up to the final rounding, however many
+there are, and median and percentiles take time proportional to the size of
+the stack rather than sorting it.
+
+### Accumulators
+
+To summarize more values than are worth keeping, such as `cat metrics.txt |
+rpn`, fold them into a named accumulator instead.  `<name>+=` pops y into one,
+and `acc:<name>` folds whatever is left on the stack at the end of each line
+(starting with the current one) into it, until `noacc`.  Only a running
+summary is kept, so memory stays the same however many values go in.
+
+Read a statistic back with `$<name>.<stat>`, where stat is `count`, `sum`,
+`mean`, `var`, `stddev`, `min`, `max`, `median` or `pN` for the Nth
+percentile:
+
+    |> 1 2 3 4 5 6 7 8 9 10 acc:lat
+    |acc:lat|> noacc $lat.mean $lat.max
+    x = 5.5
+    y = 10.0
+
+All but the median and percentiles are exact.  Those are estimated to within
+1% of the value, whatever the range.  `l:a` lists the accumulators and
+`noacc:<name>` deletes one.  Folding values in can not be undone.
+"""
+
+DOCS['Vectors'] = """
+A vector is a single stack entry holding a list of numbers.  Type one in
+brackets, closed on the same line, or use `vec` to make one from values
+already on the stack:
+
+    |> [1 2 3]
+    y = [1.0 2.0 3.0]
+
+    |> 4 5 6 3 vec
+    x = [1.0 2.0 3.0]
+    y = [4.0 5.0 6.0]
+
+Operators work on each element in turn, pairing up the elements of two
+vectors (which must be the same length) or applying a single number to every
+element.  So do comparisons, `sqrt`, `log`, the trigonometry functions, the
+complex number parts (`real`, `imag`, `mag` and `phase`) and unit conversions:
+
+    |> *
+    y = [4.0 10.0 18.0]
+
+    |> 2 /
+    y = [2.0 5.0 9.0]
+
+    |> in>cm
+    y = [5.08 12.7 22.86]
+
+This is much faster than working on thousands of separate stack values,
+especially with NumPy installed, which is used automatically if it is there.
+Elements are always floating point (or complex) values.  Long vectors are
+displayed as their first and last few elements and their length.  `unvec`
+pushes the elements back onto the stack.
 """
 
 DOCS['Trigonometry'] = """
@@ -782,19 +1011,43 @@ different ratios of products or inverses.  Some good examples of this are:
     10 mph>min/mile
     5 gallons>in*in*in
     90 kwh>kj
+    1 kg*m/s^2>lb*ft/s^2
+    14.7 psi>kpa
 
 The basic pattern is:
 
     old>new
 
-Where wither old or new can be a single unit type or a product of types.  The
-conversion engine is smart enough to invert old, if needed for a unit match.
-The engine is also smart enough to detect unit mismatch, for example:
+Where wither old or new can be a single unit type or a product of types.
+Every type after a `/` divides, so `n/m*m` is per square meter, and any type
+can have a power, as in `m^3` or `s^-1`.  Units that appear on both sides of
+a `/` cancel out.  The conversion engine is smart enough to invert old, if
+needed for a unit match.  The engine is also smart enough to detect unit
+mismatch, for example:
 
     1 acre>feet  (Error)
     1 acre>feet*feet (Ok)
+    1 acre>feet^2 (Ok)
+
+Any unit in the tables can also have an SI prefix: p, n, u (or \u00b5), m, k,
+M, G or T, as in `kJ`, `Mg` or `us`.  Memory units can have a binary prefix
+instead: Ki, Mi or Gi, as in `GiB/s>Mbit/s`.  A name that is already known is
+never read as a prefix, so `min` is minutes (not milli-inches), and `kb`, `mb`
+and `gb` are still 2^10, 2^20 and 2^30 bytes, where `MB` is 10^6.  Where more
+than one prefix fits, the longest is used.  Aliases, which may stand for
+several units, can't have a prefix (`kmph` is not kilo-mph), and neither can
+temperatures, since scaling one would move its zero too.  A name that
+doesn't start with a prefix can be written in any case, as in `Hz` or `Pa`,
+but one that does must match as written: `Mb` is not `mb`.
+
+To convert every value on the stack at once, double the `>`, as in
+`psi>>kpa`.  `n:psi>>kpa` converts just the top y values instead (after
+popping y).  This is much faster than converting values one at a time, and
+if any value can't be converted, the stack is left as it was.
 
 use the `l:c` command to list all known conversion types.
+
+The units are set up once per process, and shared by every calculator in it.
 """
 
 DOCS['Undo/Redo'] = """
@@ -802,4 +1055,10 @@ In interactive mode, every time you hit [Enter], rpncalc snapshots the state of
 your stack (if it changed) before executing any commands.  You can then use 'u'
 and 'r' to step forward and backward though historical stack states.  This can
 be used to correct mistakes or (slightly) abused to assist with calculations.
+
+Snapshots share the part of the stack that did not change, so taking one only
+costs as much as what the last command touched, even for very large stacks.  Up
+to 50 snapshots are kept, limited to 256 MB of memory by default.  Use `undomem`
+to change the limit, e.g. `16 undomem`, or `0 undomem` to keep only the current
+state.
 """
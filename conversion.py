@@ -3,22 +3,59 @@
 # For example mph -> min/mile
 #
 
+import collections
+import fractions
+import functools
 import math
+import re
 import sys
+import types
 
 #
 # Implementation:
 #
-# Step 1: interpret the type string via a series of aliases
-# Step 2: flip term 1 if needed, or return an error if there is no way to
-#   convert
-# Step 3: convert numerators
-# Step 4: If needed
-#  a) invert
-#  b) convert numerators
-#  c) invert
+# Each unit is a Unit: a scale factor times a product of powers of the base
+# dimensions (the classes below, such as Distance or Time), kept as a tuple
+# of exponents.  A type string such as kg*m/s^2 multiplies out the Units of
+# its names, expanding any aliases, so repeated units simply cancel.
+#
+# Two types convert if their exponents match, or are exact opposites, in
+# which case the result is inverted (as for mph>min/mile).  Each such pair
+# only has to be worked out once, into a ConversionPlan, which is kept in an
+# LRU cache.
+#
+# The units never change, so they are built into a Registry once, when this
+# module is loaded, and shared (along with its cache of plans) by every
+# Conversion.
+
+# How many (source, target) plans are cached.
+PLAN_CACHE_SIZE = 1024
+
+# One name in a type string: the * or / before it, the name, and its power.
+TYPE_TERM = re.compile(r'([*/]?)([a-zA-Z\u00b5_]+)(?:\^(-?[0-9]+))?')
+
+#
+# Prefixes, which can go in front of any unit name (see Registry.Lookup)
 #
-# Done!
+
+SI_PREFIXES = {
+  'p': fractions.Fraction(1, 10 ** 12),
+  'n': fractions.Fraction(1, 10 ** 9),
+  'u': fractions.Fraction(1, 10 ** 6),
+  '\u00b5': fractions.Fraction(1, 10 ** 6),
+  'm': fractions.Fraction(1, 10 ** 3),
+  'k': fractions.Fraction(10 ** 3),
+  'M': fractions.Fraction(10 ** 6),
+  'G': fractions.Fraction(10 ** 9),
+  'T': fractions.Fraction(10 ** 12),
+}
+
+# Only for Memory units.
+BINARY_PREFIXES = {
+  'Ki': fractions.Fraction(2 ** 10),
+  'Mi': fractions.Fraction(2 ** 20),
+  'Gi': fractions.Fraction(2 ** 30),
+}
 
 #
 # Conversions to meters
@@ -90,7 +127,7 @@ CYCLE_CONVERT = (
 MEMORY_CONVERT = (
   (1.0000, 'bit', 'bits'),
   (1024.0000, 'kilobit', 'kilobits'),
-  (8.0000, 'byte', 'bytes'),
+  (8.0000, 'byte', 'bytes', 'B'),
   (8192.0000, 'kilobyte', 'kilobytes', 'kb'),
   (8388608.0000, 'megabyte', 'megabytes', 'mb'),
   (8589934592.0000, 'gigabyte', 'gigabytes', 'gb'),
@@ -132,6 +169,18 @@ TEMPERATURE_CONVERT = (
   ((1.0, -273.15), 'k', 'kelvin'),
 )
 
+# Each class of units is one dimension.
+UNIT_TABLES = (
+  ('Distance', DISTANCE_CONVERT),
+  ('Time', TIME_CONVERT),
+  ('Force/Weight/Mass (Planet Earth)', MASS_CONVERT),
+  ('Cycles', CYCLE_CONVERT),
+  ('Memory', MEMORY_CONVERT),
+  ('Angles', ANGLE_CONVERT),
+  ('Energy', ENERGY_CONVERT),
+  ('Temperature', TEMPERATURE_CONVERT),
+)
+
 #
 # Aliases to help things along
 #
@@ -179,6 +228,7 @@ ALIASES = {
   'tsp': '_teaspoonmeters*_teaspoonmeters*_teaspoonmeters',
   'teaspoon': 'tsp',
   'teaspoons': 'tsp',
+  'w': 'watt',
   'watt': 'joules/second',
   'watts': 'watt',
 }
@@ -213,76 +263,16 @@ class IncompatibleConversionTypes(Error):
 
 class Conversion:
 
-  def __init__(self):
-    self.convert_dict = {}
-    self._InsertKeys('Distance', DISTANCE_CONVERT)
-    self._InsertKeys('Time', TIME_CONVERT)
-    self._InsertKeys('Force/Weight/Mass (Planet Earth)', MASS_CONVERT)
-    self._InsertKeys('Cycles', CYCLE_CONVERT)
-    self._InsertKeys('Memory', MEMORY_CONVERT)
-    self._InsertKeys('Angles', ANGLE_CONVERT)
-    self._InsertKeys('Energy', ENERGY_CONVERT)
-    self._InsertKeys('Temperature', TEMPERATURE_CONVERT)
+  def __init__(self, registry=None):
+    self.registry = registry or REGISTRY
+    self.convert_dict = self.registry.convert_dict
 
   def Convert(self, value, value_type, target_type):
+    return self.registry.Plan(value_type, target_type).Apply(value)
 
-    # extract type and class information
-
-    source = self._AnalyzeType(value_type)
-    target = self._AnalyzeType(target_type)
-
-    # check for ratio incompatibility
-
-    if source.IsRatio() != target.IsRatio():
-      raise IllegalConversionBetweenRatioAndScalar()
-
-    # check for inversion eligibility
-
-    if (target.IsRatio() and
-        (source.numerator_name == target.denominator_name)):
-      target.Invert()
-
-    # check for numerator compatibility
-
-    if source.numerator_name != target.numerator_name:
-      raise IncompatibleConversionTypes(source.numerator_name,
-                                        target.numerator_name)
-
-    # check for denominator compatibility, if needed
-
-    if (source.IsRatio() and
-        (source.denominator_name != target.denominator_name)):
-      raise IncompatibleConversionTypes(source.denominator_name,
-                                        target.denominator_name)
-
-    # scale the value by each numerator
-
-    for snum in source.numerator:
-      value = self._ScaleUp(value, snum.scale_factor)
-    for tnum in target.numerator:
-      value = self._ScaleDown(value, tnum.scale_factor)
-
-    # if needed, scale by each denominator
-
-    if source.IsRatio():
-      for sden in source.denominator:
-        value = self._ScaleDown(value, sden.scale_factor)
-      for tden in target.denominator:
-        value = self._ScaleUp(value, tden.scale_factor)
-      if target.inverted:
-        value = 1.0 / value
-
-    return value
-
-  def _ScaleUp(self, value, scale_factor):
-    if isinstance(scale_factor, tuple):
-      return (value + scale_factor[1]) * scale_factor[0]
-    return value * scale_factor
-
-  def _ScaleDown(self, value, scale_factor):
-    if isinstance(scale_factor, tuple):
-      return (value / scale_factor[0]) - scale_factor[1]
-    return value / scale_factor
+  def Plan(self, value_type, target_type):
+    """Returns the ConversionPlan from value_type to target_type."""
+    return self.registry.Plan(value_type, target_type)
 
   def DumpHelp(self):
 
@@ -320,107 +310,221 @@ class Conversion:
       sys.stdout.write('%-15s ' % name)
     sys.stdout.write('\n')
 
-  def _AnalyzeType(self, type_str):
 
-    numerator_type_list, denominator_type_list = self._AnalyzeTypeStr(type_str)
+class Registry:
+  """Every unit, by name, built once and then shared.
 
-    self._CheckForAliases(numerator_type_list, denominator_type_list)
-    self._CheckForAliases(denominator_type_list, numerator_type_list)
+  Its mappings are read-only, and so are the ConversionTypes and Units in
+  them, so that no Conversion can change them for the others.
+  """
 
-    numerator = []
-    denominator = []
-
-    for numerator_type in numerator_type_list:
-      if numerator_type not in self.convert_dict:
-        raise UnknownConversionType(numerator_type)
-      numerator.append(self.convert_dict[numerator_type])
-
-    for denominator_type in denominator_type_list:
-      if denominator_type not in self.convert_dict:
-        raise UnknownConversionType(denominator_type)
-      denominator.append(self.convert_dict[denominator_type])
-
-    return ConversionData(numerator, denominator)
-
-  def _CheckForAliases(self, numerator, denominator):
-
-    index = 0
-    while index < len(numerator):
-      if numerator[index] in ALIASES:
-        alias = ALIASES[numerator[index]]
-        del numerator[index]
-        if '/' in alias:
-          n, d = alias.split('/')
-          numerator.extend(n.split('*'))
-          denominator.extend(d.split('*'))
-        else:
-          numerator.extend(alias.split('*'))
-        index = 0
-      else:
-        index += 1
-
-    numerator.sort()
-    denominator.sort()
-
-  def _AnalyzeTypeStr(self, type_str):
-    if '/' in type_str:
-      num, den = type_str.split('/')
-      numerator_type = sorted(num.split('*'))
-      denominator_type = sorted(den.split('*'))
-    else:
-      numerator_type = sorted(type_str.split('*'))
-      denominator_type = []
-    return numerator_type, denominator_type
-
-
-  def _InsertKeys(self, class_name, data):
-
-    for conversion_tuple in data:
-      scale_factor = conversion_tuple[0]
-      keys = conversion_tuple[1:]
-      for key in keys:
-        if key in self.convert_dict:
-          raise DuplicateKey(key)
-        self.convert_dict[key] = ConversionType(class_name, scale_factor)
-
-
-class ConversionData:
-
-  def __init__(self, numerator, denominator):
+  def __init__(self, convert_dict, units, dimensions):
     """Constructor.
 
     Args:
-      numerator: ConversionType
-      denominator: ConversionType for a ratio, None otherwise
+      convert_dict: name -> ConversionType
+      units: name -> Unit
+      dimensions: the class name of each dimension, in the order of
+        Unit.dimensions
     """
+    self.convert_dict = types.MappingProxyType(convert_dict)
+    self.units = types.MappingProxyType(units)
+    self.dimensions = dimensions
+    self.Plan = functools.lru_cache(maxsize=PLAN_CACHE_SIZE)(self._CompilePlan)
+    self.Lookup = functools.lru_cache(maxsize=PLAN_CACHE_SIZE)(self._LookupName)
+    self._memory = tuple(int(name == 'Memory') for name in dimensions)
+
+  @staticmethod
+  def Build():
+    convert_dict = {}
+    for class_name, data in UNIT_TABLES:
+      _InsertKeys(convert_dict, class_name, data)
+    dimensions = tuple(class_name for class_name, _ in UNIT_TABLES)
+    units = {name: _BaseUnit(conversion, dimensions)
+             for name, conversion in convert_dict.items()}
+    return Registry(convert_dict, units, dimensions)
+
+  def _CompilePlan(self, value_type, target_type):
 
-    self.numerator = numerator
-    self.denominator = denominator
-    self.inverted = False
-    self.numerator_name = self._BuildClassName(
-        self.numerator, self.denominator)
-    self.denominator_name = self._BuildClassName(
-        self.denominator, self.numerator)
+    # extract the scale and dimensions of each type
 
-  def IsRatio(self):
-    return self.denominator is not None
+    source = self._ParseType(value_type)
+    target = self._ParseType(target_type)
 
-  def Invert(self):
-    self.numerator, self.denominator = self.denominator, self.numerator
-    self.numerator_name, self.denominator_name = (
-        self.denominator_name, self.numerator_name)
-    self.inverted = not self.inverted
+    # the same dimensions convert directly, with offsets for temperatures
+
+    if source.dimensions == target.dimensions:
+      return ConversionPlan(source.scale / target.scale,
+                            (source.offset - target.offset) / target.scale)
+
+    # opposite ones convert to the inverse, as for mph>min/mile
+
+    if (any(source.dimensions) and
+        source.dimensions == tuple(-power for power in target.dimensions)):
+      return ConversionPlan(source.scale * target.scale, 0, invert=True)
+
+    raise IncompatibleConversionTypes(self._DimensionName(source.dimensions),
+                                      self._DimensionName(target.dimensions))
+
+  def _ParseType(self, type_str):
+    """Returns the Unit for a type string, such as kg*m/s^2.
+
+    Names are joined by * or /, and every name after a / divides, so that
+    n/m*m is per square meter.  Any name can have a whole power, as in m^3.
+    """
+    terms = TYPE_TERM.findall(type_str)
+    scale = fractions.Fraction(1)
+    dimensions = [0] * len(self.dimensions)
+    divide = False
+    for operator, name, power in terms:
+      divide = divide or operator == '/'
+      unit = self.Lookup(name)
+      power = int(power) if power else 1
+      if divide:
+        power = -power
+      scale *= unit.scale ** power
+      for index, exponent in enumerate(unit.dimensions):
+        dimensions[index] += exponent * power
+    if len(terms) == 1 and power == 1:
+      return unit  # which keeps a temperature's offset
+    return Unit(scale, tuple(dimensions))
+
+  def _LookupName(self, name):
+    """Returns the Unit for one name, which may have a prefix.
+
+    A name in the tables or ALIASES is always taken as it is, so min is a
+    minute (not a milli-inch) and mb keeps its old meaning of 2^20 bytes,
+    where MB is 10^6.  Otherwise the name is looked for as a prefix (the
+    longest that fits) in front of a name in the tables, tried as it is and
+    then in lower case, as in kJ.  Prefixes do not go in front of ALIASES,
+    which may stand for several units (kmph is not kilo-mph), and do not
+    stack.  Binary prefixes only go with Memory units.  A unit with an
+    offset (a temperature) can't have a prefix, since scaling it would move
+    its zero as well.  Only a name that doesn't start with a prefix is tried
+    in lower case as a whole, as in Hz, so that Mb isn't taken for mb.
+    """
+    unit = self._UnprefixedUnit(name)
+    if unit is not None:
+      return unit
+    prefixes = list(_Prefixes(name))
+    for length, factor, binary in reversed(prefixes):
+      rest = name[length:]
+      unit = self.units.get(rest) or self.units.get(rest.lower())
+      if unit is None or (binary and unit.dimensions != self._memory):
+        continue
+      if unit.offset:
+        raise UnknownConversionType(name)
+      return Unit(unit.scale * factor, unit.dimensions)
+    if not prefixes:
+      unit = self._UnprefixedUnit(name.lower())
+      if unit is not None:
+        return unit
+    raise UnknownConversionType(name)
+
+  def _UnprefixedUnit(self, name):
+    if name in ALIASES:
+      return self._ParseType(ALIASES[name])
+    return self.units.get(name)
+
+  def _DimensionName(self, dimensions):
+    numerator = []
+    denominator = []
+    for name, power in sorted(zip(self.dimensions, dimensions)):
+      if power:
+        if abs(power) != 1:
+          name = '%s^%d' % (name, abs(power))
+        (numerator if power > 0 else denominator).append(name)
+    name = '*'.join(numerator) or '1'
+    if denominator:
+      name += '/' + '*'.join(denominator)
+    return name
+
+
+def _InsertKeys(convert_dict, class_name, data):
+
+  for conversion_tuple in data:
+    scale_factor = conversion_tuple[0]
+    keys = conversion_tuple[1:]
+    for key in keys:
+      if key in convert_dict:
+        raise DuplicateKey(key)
+      convert_dict[key] = ConversionType(class_name, scale_factor)
+
+
+def _BaseUnit(conversion, dimensions):
+  powers = tuple(int(name == conversion.class_name) for name in dimensions)
+  scale_factor = conversion.scale_factor
+  if isinstance(scale_factor, tuple):
+    scale = _Decimal(scale_factor[0])
+    return Unit(scale, powers, _Decimal(scale_factor[1]) * scale)
+  return Unit(_Decimal(scale_factor), powers)
+
+
+def _Decimal(value):
+  # The decimal a table entry was written as, such as exactly 1/10^9 for
+  # 1.0e-9, so that it combines exactly with prefixes.
+  return fractions.Fraction(repr(value))
+
+
+def _BuildTrie(prefixes):
+  # A trie of nested dicts, one level per letter, where the key None holds
+  # (factor, binary) for a whole prefix.
+  trie = {}
+  for binary, table in enumerate(prefixes):
+    for prefix, factor in table.items():
+      node = trie
+      for letter in prefix:
+        node = node.setdefault(letter, {})
+      node[None] = (factor, bool(binary))
+  return trie
+
+
+PREFIX_TRIE = _BuildTrie((SI_PREFIXES, BINARY_PREFIXES))
+
+
+def _Prefixes(name):
+  # Yields (length, factor, binary) for each prefix name starts with, the
+  # shortest first.
+  node = PREFIX_TRIE
+  for length, letter in enumerate(name[:-1], 1):
+    node = node.get(letter)
+    if node is None:
+      return
+    if None in node:
+      yield (length,) + node[None]
+
+
+# scale: how many of the base unit of each dimension this is, a Fraction
+# dimensions: the power of each base dimension, as a tuple
+# offset: added after scaling (only for a temperature on its own)
+Unit = collections.namedtuple('Unit', ('scale', 'dimensions', 'offset'),
+                              defaults=(0,))
+
+
+class ConversionPlan:
+  """A compiled conversion: value * multiplier + offset, inverted if needed.
+
+  The scale factors are combined exactly, as fractions, and only rounded to
+  floats here, so a plan is at least as accurate as applying each scale
+  factor in turn.
+  """
+
+  def __init__(self, multiplier, offset, invert=False):
+    self.multiplier = float(multiplier)
+    self.offset = float(offset)
+    self.invert = invert
+
+  def Apply(self, value):
+    value = value * self.multiplier
+    if self.offset:
+      value += self.offset
+    if self.invert:
+      value = 1.0 / value
+    return value
 
-  def _BuildClassName(self, numerator, denominator):
 
-    name_list = [x.class_name for x in numerator]
-    for check_name in [x.class_name for x in denominator]:
-      if check_name in name_list:
-        name_list.remove(check_name)
-    return '*'.join(sorted(name_list))
+ConversionType = collections.namedtuple(
+    'ConversionType', ('class_name', 'scale_factor'))
 
-class ConversionType:
 
-  def __init__(self, class_name, scale_factor):
-    self.class_name = class_name
-    self.scale_factor = scale_factor
+REGISTRY = Registry.Build()
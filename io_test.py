@@ -713,6 +713,19 @@ DATA = """
   I popv set
   O c = 299792458.0 e = 2.718281828459045 pi = 3.141592653589793 x = 5.0 |>
 
+  I pushv x!= pi!= 1 pi= set
+  O pi = 1.0 c = 299792458.0 e = 2.718281828459045 pi = 1.0 |>
+
+  I pushv pi!= 7 x= set
+  O x = 7.0 c = 299792458.0 e = 2.718281828459045 x = 7.0 |>
+
+  I $pi
+  E While parsing $pi: KeyError !!
+  O |>
+
+  I popv popv set
+  O c = 299792458.0 e = 2.718281828459045 pi = 3.141592653589793 x = 5.0 |>
+
 # --- Full Stack Clipboard ---
 
   I V
@@ -929,6 +942,12 @@ DATA = """
   I ru
   O 1.0 2.0 x = 3.0 y = 4.0 |>
 
+  I 5 rd rd ru
+  O 5.0 1.0 2.0 x = 3.0 y = 4.0 |>
+
+  I D 1 2 3 4 5 2 px 1 pv
+  O 1.0 2.0 4.0 x = 3.0 y = 5.0 |>
+
 # --- Undo and Redo ---
 
   I normal D 1 2
@@ -965,11 +984,61 @@ DATA = """
   E While parsing r: No Redo History Available !!
   O |>
 
+  I D 1 2 3 4
+  O 1.0 2.0 x = 3.0 y = 4.0 |>
+
+  I 2 px 9
+  O 1.0 3.0 x = 4.0 y = 9.0 |>
+
+  I 1 pv rd
+  O 9.0 1.0 3.0 x = 4.0 y = 2.0 |>
+
+  I R ru
+  O 4.0 3.0 1.0 x = 9.0 y = 2.0 |>
+
+  I u
+  O 9.0 1.0 3.0 x = 4.0 y = 2.0 |>
+
+  I u
+  O 1.0 3.0 x = 4.0 y = 9.0 |>
+
+  I u
+  O 1.0 2.0 x = 3.0 y = 4.0 |>
+
+  I r r
+  O 9.0 1.0 3.0 x = 4.0 y = 2.0 |>
+
+  I 0 undomem 5
+  O 9.0 1.0 3.0 4.0 x = 2.0 y = 5.0 |>
+
+  I u
+  E While parsing u: No Undo History Available !!
+  O |>
+
+  I 256 undomem
+  O 9.0 1.0 3.0 4.0 x = 2.0 y = 5.0 |>
+
 # --- Sourcing An External File ---
 
   I D s:sample.txt
   O y = 9.0 |>
 
+  I D i:sample.txt
+  O y = 9.0 |>
+
+  I D i:sample_data.txt
+  O 1.5 2.5 x = 1000.0 y = -300.0 |>
+
+  I mix D i:sample_data.txt nomix
+  O 1.5 2.5 x = 1000 y = -300.0 |>
+
+  I D csv:sample_data.csv
+  O 1.5 2.0 x = -4.0 y = 0.25 |>
+
+  I D i:no_such_file.txt
+  E IOError: [Errno 2] No such file or directory: 'no_such_file.txt' !!
+  O |>
+
 # --- Statistics ---
 
   I D 0.67 36 37 C sum
@@ -989,7 +1058,45 @@ DATA = """
 
   I V median
   E While parsing median: TypeError: '<' not supported between instances of 'complex' and 'complex' !!
-  O |>
+  O 1.0+1.0i x = 1.0+2.0i y = 3.0-1.0i |>
+
+  I D 0.1 0.1 0.1 0.1 0.1 0.1 0.1 0.1 0.1 0.1 sum
+  O y = 1.0 |>
+
+  I D 2 4 4 4 5 5 7 9 C var
+  O y = 4.571428571428571 |>
+
+  I V stddev
+  O y = 2.138089935299395 |>
+
+  I V min
+  O y = 2.0 |>
+
+  I V max
+  O y = 9.0 |>
+
+  I V mode
+  O y = 4.0 |>
+
+  I V 25 pct
+  O y = 4.0 |>
+
+  I V 100 pct
+  O y = 9.0 |>
+
+  I V 101 pct
+  E Value Error: percentile must be from 0 to 100 !!
+  O 2.0 4.0 4.0 4.0 5.0 5.0 x = 7.0 y = 9.0 |>
+
+  I k:median
+  O 2.0 4.0 4.0 4.0 5.0 5.0 7.0 x = 9.0 y = 5.0 |>
+
+  I y 50 k:pct
+  O 2.0 4.0 4.0 4.0 5.0 5.0 7.0 x = 9.0 y = 5.0 |>
+
+  I D 5 var
+  E Value Error: variance needs at least two values !!
+  O y = 5.0 |>
 
   I D sum
   E While parsing sum: Stack is empty !!
@@ -1003,6 +1110,174 @@ DATA = """
   E While parsing median: Stack is empty !!
   O |>
 
+  I 1 2 3 acc:lat
+  O |acc:lat|>
+
+  I 4 5
+  O |acc:lat|>
+
+  I 6 7 8 9 10
+  O |acc:lat|>
+
+  I 1+2j
+  E While parsing acc:lat: TypeError: float() argument must be a string or a real number, not 'complex' !!
+  O y = 1.0+2.0j |acc:lat|>
+
+  I D noacc $lat.count $lat.mean
+  O x = 10.0 y = 5.5 |>
+
+  I D $lat.sum $lat.var $lat.min $lat.max
+  O 55.0 9.166666666666666 x = 1.0 y = 10.0 |>
+
+  I D $lat.median $lat.p0 $lat.p100
+  O 5.98951037117262 x = 1.0 y = 10.0 |>
+
+  I D 100 lat+= $lat.max
+  O y = 100.0 |>
+
+  I l:a
+  O lat | count=11 mean=14.0909 min=1 median=5.98951 max=100 |>
+
+  I $lat.foo
+  E Value Error: unknown statistic: foo !!
+  O |>
+
+  I D 5 other+= $other.var
+  E Value Error: variance needs at least two values !!
+  O |>
+
+  I acc:other noacc:other l:a
+  O lat | count=11 mean=14.0909 min=1 median=5.98951 max=100 |>
+
+  I noacc:lat $lat.count
+  E While parsing $lat.count: KeyError !!
+  O |>
+
+  I acc:ops i:sample_ops.txt
+  E While parsing +: Not Enough Stack Arguments !!
+  O |acc:ops|>
+
+  I D noacc $ops.count $ops.sum
+  O x = 2.0 y = 3.0 |>
+
+# --- Sequences ---
+
+  I D 0 5 range
+  O 0.0 1.0 2.0 x = 3.0 y = 4.0 |>
+
+  I D 1 2 0.25 frange
+  O 1.0 1.25 x = 1.5 y = 1.75 |>
+
+  I D 1 0 -0.25 frange
+  O 1.0 0.75 x = 0.5 y = 0.25 |>
+
+  I D 1 2 0 frange
+  E Value Error: step can not be zero !!
+  O |>
+
+  I D 0 1 5 linspace
+  O 0.0 0.25 0.5 x = 0.75 y = 1.0 |>
+
+  I D 0 3 4 logspace
+  O 1.0 10.0 x = 100.0 y = 1000.0 |>
+
+  I D 7 1 repeat 1+1j 2 repeat
+  O 7.0 x = 1.0+1.0j y = 1.0+1.0j |>
+
+  I D 0 100000 range k:sum
+  O ... 99991.0 99992.0 99993.0 99994.0 99995.0 99996.0 99997.0 99998.0 x = 99999.0 y = 4999950000.0 |>
+
+  I D mix 0 3 range nomix
+  O 0 x = 1 y = 2 |>
+
+# --- Vectors ---
+
+  I D [1 2 3]
+  O y = [1.0 2.0 3.0] |>
+
+  I 2 * [10 20 30] +
+  O y = [12.0 24.0 36.0] |>
+
+  I 4 5 6 3 vec -
+  O y = [8.0 19.0 30.0] |>
+
+  I D [1 -4] sqrt
+  O y = [1.0+0.0j 2.0j] |>
+
+  I D [1 2 3] 2 >=
+  O y = [0.0 1.0 1.0] |>
+
+  I D [1 2] in>cm
+  O y = [2.54 5.08] |>
+
+  I D [0 90] deg sin rad
+  O y = [0.0 1.0] |>
+
+  I D [1+2j -3] real [1+2j -3] imag
+  O x = [1.0 -3.0] y = [2.0 0.0] |>
+
+  I D [3+4j -3] mag [1 -3] mag
+  O x = [5.0 3.0] y = [1.0 -3.0] |>
+
+  I D [1j -3] deg phase rad [1 -3] phase
+  O x = [90.0 180.0] y = [0.0 0.0] |>
+
+  I D [1 2 3 4 5 6 7]
+  O y = [1.0 2.0 3.0 ... 5.0 6.0 7.0] (7) |>
+
+  I unvec
+  O 1.0 2.0 3.0 4.0 5.0 x = 6.0 y = 7.0 |>
+
+  I D 1 [ 2 3 4 + ]
+  O x = 1.0 y = [2.0 7.0] |>
+
+  I D [1 2] [1 2 3] +
+  E Value Error: vectors must be the same length !!
+  O |>
+
+  I D [1 2] 0 /
+  E Divide By Zero !!
+  O |>
+
+  I D [1 2] 2 vec
+  E While parsing vec: Not Enough Stack Arguments !!
+  O y = [1.0 2.0] |>
+
+  I D 1 [2 3] 2 vec
+  E While parsing vec: TypeError: a vector can not hold vectors !!
+  O |>
+
+  I D 5 unvec
+  E While parsing unvec: TypeError: unvec needs a vector !!
+  O |>
+
+  I D ]
+  E While parsing ]: ] without [ !!
+  O |>
+
+  I D [ 1 +
+  E While parsing +: Not Enough Stack Arguments !!
+  O |>
+
+  I D 1 2 3 ]
+  E While parsing ]: ] without [ !!
+  O 1.0 x = 2.0 y = 3.0 |>
+
+  I 1 [ 2 D 3 ]
+  E While parsing ]: ] without [ !!
+  O y = 3.0 |>
+
+  I D [ 1 2
+  E [ without ] !!
+  O x = 1.0 y = 2.0 |>
+
+  I 3 ]
+  E While parsing ]: ] without [ !!
+  O 1.0 x = 2.0 y = 3.0 |>
+
+  I D 0 5 v:range 0 1 3 v:linspace 7 2 v:repeat
+  O [0.0 1.0 2.0 3.0 4.0] x = [0.0 0.5 1.0] y = [7.0 7.0] |>
+
 # --- Fixed Display Mode ---
 
   I D 3 fixed 10 0.567 -1.6789
@@ -1176,13 +1451,125 @@ DATA = """
   O y = 640.0000003797903 |>
 
   I D 1 pint>tsp
-  O y = 96.00000007299742 |>
+  O y = 96.00000007299744 |>
 
   I D 10 n*m>in*lbs
-  O y = 88.50431476562046 |>
+  O y = 88.50431476562045 |>
 
   I D 4 ft>yards 25 25 * * yard*yard*yard>gallon
-  O y = 168311.68848798322 |>
+  O y = 168311.68848798325 |>
+
+  I D 1 kg*m/s^2>lb*ft/s^2
+  O y = 7.233013851209894 |>
+
+  I D 2 m*m/m>in
+  O y = 78.74015748031496 |>
+
+  I D 14.7 psi>kpa
+  O y = 101.35653166381259 |>
+
+  I D 10 mph>min/mile
+  O y = 6.0 |>
+
+  I D 212 f>c
+  O y = 100.0 |>
+
+  I D 1 acre>feet
+  E While parsing acre>feet: Incompatible Conversion Types: Distance^2 -> Distance !!
+  O |>
+
+  I D 1 acre>feet^2
+  O y = 43559.99997415052 |>
+
+  I D 1 foo>m
+  E While parsing foo>m: Unknown Conversion Type: foo !!
+  O |>
+
+  I D 1 GiB/s>Mbit/s
+  O y = 8589.934592 |>
+
+  I D 1 mb>MB
+  O y = 1.048576 |>
+
+  I D 100 Mbit>Gbit
+  O y = 0.1 |>
+
+  I D 1 Hz>rpm
+  O y = 60.0 |>
+
+  I D 2000 Pa>kpa
+  O y = 2.0 |>
+
+  I D 1 Mb>bit
+  E While parsing Mb>bit: Unknown Conversion Type: Mb !!
+  O |>
+
+  I D 1 Gb>bit
+  E While parsing Gb>bit: Unknown Conversion Type: Gb !!
+  O |>
+
+  I D 1 kmph>mph
+  E While parsing kmph>mph: Unknown Conversion Type: kmph !!
+  O |>
+
+  I D 1 kJ>j
+  O y = 1000.0 |>
+
+  I D 1 MB>byte
+  O y = 1000000.0 |>
+
+  I D 1 mK>K
+  E While parsing mK>K: Unknown Conversion Type: mK !!
+  O |>
+
+  I D 1 uF>F
+  E While parsing uF>F: Unknown Conversion Type: uF !!
+  O |>
+
+  I D 5 us>ns
+  O y = 5000.0 |>
+
+  I D 2 min>s
+  O y = 120.0 |>
+
+  I D 1 Kim>m
+  E While parsing Kim>m: Unknown Conversion Type: Kim !!
+  O |>
+
+  I D 1 2 3 psi>>kpa
+  O 6.895002154000856 x = 13.790004308001713 y = 20.68500646200257 |>
+
+  I D 1 2 3 2 n:psi>>kpa
+  O 1.0 x = 13.790004308001713 y = 20.68500646200257 |>
+
+  I D 1 2 1.5 n:m>>cm
+  E Value Error: the count must be a whole number !!
+  O 1.0 x = 2.0 y = 1.5 |>
+
+  I D 1 2 -1 n:m>>cm
+  E While parsing n:m>>cm: Not Enough Stack Arguments !!
+  O 1.0 x = 2.0 y = -1.0 |>
+
+  I D 32 212 f>>c
+  O x = 0.0 y = 100.0 |>
+
+  I D [1 2] 3 in>>cm
+  O x = [2.54 5.08] y = 7.62 |>
+
+  I D 0 5000 range in>>cm k:sum
+  O ... 12677.14 12679.68 12682.22 12684.76 12687.3 12689.84 12692.380000000001 12694.92 x = 12697.460000000001 y = 31743650.0 |>
+
+  I D 1 2 3 psi>>m
+  E While parsing psi>>m: Incompatible Conversion Types: Force/Weight/Mass (Planet Earth)/Distance^2 -> Distance !!
+  O 1.0 x = 2.0 y = 3.0 |>
+
+  I D 1 0 mph>>min/mile
+  E Divide By Zero !!
+  O x = 1.0 y = 0.0 |>
+
+  I D 1 2 5 n:in>>cm
+  E While parsing n:in>>cm: Not Enough Stack Arguments !!
+  O 1.0 x = 2.0 y = 5.0 |>
 
   I D 10+i in>cm
   O y = 25.4+2.54i |>
@@ -1194,6 +1581,9 @@ DATA = """
   I l:c
   A
 
+  I l:cache
+  A
+
 # --- Macros ---
 
   I m:pyth 2 ** s 2 ** + sqrt
@@ -1225,6 +1615,275 @@ DATA = """
   E While parsing $a: KeyError !!
   O |>
 
+  I m:later 1 nosuch 2
+  O |>
+
+  I D @later
+  E While parsing nosuch: Unknown Argument (try ? for help) !!
+  O y = 1.0 |>
+
+  I m:later 7
+  O |>
+
+  I D @later
+  O y = 7.0 |>
+
+  I m:optm 2 3 * d * s s s 1 inv
+  O |>
+
+  I D 1 @optm
+  O 36.0 x = 1.0 y = 1.0 |>
+
+  I opt D 1 @optm
+  O 36.0 x = 1.0 y = 1.0 |opt|>
+
+  I D @optm
+  E While parsing s: Not Enough Stack Arguments !!
+  O |opt|>
+
+  I debug l:m
+  O Exec: debug later | 7 => 7 local | 5 a= => 5 a= optm | 2 3 * d * s s s 1 inv => 36.0 (s s) s 1.0 pyth | 2 ** s 2 ** + sqrt => 2 ** s 2 ** + sqrt q | q => q Exec: l:m |debug|opt|>
+
+  I noopt l:m
+  O Exec: noopt later | 7 local | 5 a= optm | 2 3 * d * s s s 1 inv pyth | 2 ** s 2 ** + sqrt q | q Exec: l:m |debug|>
+
+  I m:twopi $pi 2 *
+  O Defined macro: twopi Exec: m:twopi $pi 2 * |debug|>
+
+  I opt l:m
+  O Exec: opt later | 7 => 7 local | 5 a= => 5 a= optm | 2 3 * d * s s s 1 inv => 36.0 (s s) s 1.0 pyth | 2 ** s 2 ** + sqrt => 2 ** s 2 ** + sqrt q | q => q twopi | $pi 2 * => $pi 2 * Exec: l:m |debug|opt|>
+
+  I nodebug noopt
+  O |>
+
+  I m:hyp d * s d * + sqrt
+  O |>
+
+  I D 3 4 @hyp
+  O y = 5.0 |>
+
+  I D 3+4i 0 @hyp
+  O y = 3.0+4.0i |>
+
+  I D 4 @hyp
+  E While parsing s: Not Enough Stack Arguments !!
+  O |>
+
+  I m:rcp 1 s /
+  O |>
+
+  I D 4 @rcp
+  O y = 0.25 |>
+
+  I D 0 @rcp
+  E Divide By Zero !!
+  O |>
+
+  I m:dropv popv 1 +
+  O |>
+
+  I D @dropv
+  E While parsing +: Not Enough Stack Arguments !!
+  O |>
+
+  I m:keepv pushv 1 +
+  O |>
+
+  I D @keepv
+  E While parsing +: Not Enough Stack Arguments !!
+  O |>
+
+  I D 5 @dropv
+  O y = 6.0 |>
+
+  I m:openv [ 1 nosuch
+  O |>
+
+  I D 5 [ 6 @openv 7 ]
+  E While parsing nosuch: Unknown Argument (try ? for help) !!
+  O x = 5.0 y = [6.0 1.0 7.0] |>
+
+  I m:countdown 1 - d ?countdown
+  O |>
+
+  I D 5000 @countdown
+  O y = 0.0 |>
+
+  I m:tri d 1 - d ?tri +
+  O |>
+
+  I D 3000 @tri
+  O y = 4501500.0 |>
+
+  I m:inc 1 +
+  O |>
+
+  I D 0 20000 times:inc
+  O y = 20000.0 |>
+
+  I D 7 0 times:inc 5 -2 times:inc
+  O x = 7.0 y = 5.0 |>
+
+  I D 0 0 10 for:+
+  E While parsing for:+: Unknown Argument (try ? for help) !!
+  O 0.0 x = 0.0 y = 10.0 |>
+
+  I m:add +
+  O |>
+
+  I D 0 3 7 for:add
+  O y = 18.0 |>
+
+  I D 7 3 for:add
+  O |>
+
+  I m:dec 1 - d
+  O |>
+
+  I D 5 d while:dec
+  O y = 0.0 |>
+
+  I D while:dec
+  E While parsing while:dec: Not Enough Stack Arguments !!
+  O |>
+
+  I D 1 while:nosuch
+  E While parsing while:nosuch: Macro Not Found: nosuch !!
+  O y = 1.0 |>
+
+  I m:setn 3 n=
+  O |>
+
+  I D 2 times:setn
+  O n = 3.0 n = 3.0 |>
+
+  I $n
+  E While parsing $n: KeyError !!
+  O |>
+
+  I m:twice 2 *
+  O |>
+
+  I D 1 2 3 4 map:twice
+  O 2.0 4.0 x = 6.0 y = 8.0 |>
+
+  I map:d
+  O 2.0 2.0 4.0 4.0 6.0 6.0 x = 8.0 y = 8.0 |>
+
+  I D 1 2 3 4 map:sqrt
+  O 1.0 1.4142135623730951 x = 1.7320508075688772 y = 2.0 |>
+
+  I m:big 2 >
+  O |>
+
+  I D 1 2 3 4 filter:big
+  O x = 3.0 y = 4.0 |>
+
+  I D 1 2 3 4 reduce:+
+  O y = 10.0 |>
+
+  I D 1 5 2 4 reduce:max
+  O y = 5.0 |>
+
+  I D 3 4 reduce:pyth
+  O y = 5.0 |>
+
+  I D 1 0 2 map:inv
+  E Divide By Zero !!
+  O 1.0 x = 0.0 y = 2.0 |>
+
+  I D 1 2 map:nosuch
+  E While parsing map:nosuch: Macro Not Found: nosuch !!
+  O x = 1.0 y = 2.0 |>
+
+  I D reduce:+
+  E While parsing reduce:+: Stack is empty !!
+  O |>
+
+  I D 2 pworkers 0 5000 range pmap:twice k:sum
+  O ... 9982.0 9984.0 9986.0 9988.0 9990.0 9992.0 9994.0 9996.0 x = 9998.0 y = 24995000.0 |>
+
+  I D 1 5000 range 0 1 pmap:inv
+  E While parsing pmap:inv: s2: Divide By Zero !!
+  E While parsing pmap:inv: 1 of 5001 values failed !!
+  O ... 4992.0 4993.0 4994.0 4995.0 4996.0 4997.0 4998.0 4999.0 x = 0.0 y = 1.0 |>
+
+  I D 1 2 3 pmap:twice
+  O 2.0 x = 4.0 y = 6.0 |>
+
+  I D 1 2 pmap:nosuch
+  E While parsing pmap:nosuch: Macro Not Found: nosuch !!
+  O x = 1.0 y = 2.0 |>
+
+  I m:sq2 sq 2 -
+  O |>
+
+  I D 0 2 solve:sq2
+  O y = 1.4142135623731364 |>
+
+  I D 0 1 solve:sq2
+  E Value Error: f(x) has the same sign at both ends of the range !!
+  O x = 0.0 y = 1.0 |>
+
+  I D 0 $pi integrate:sin
+  O y = 2.0 |>
+
+  I D 0 1 integrate:sq2
+  O y = -1.6666666666666665 |>
+
+  I D 0 1 integrate:inv
+  E Value Error: the integral did not converge !!
+  O x = 0.0 y = 1.0 |>
+
+  I D -1 1 integrate:sqrt
+  E Value Error: the macro must leave a real number !!
+  O x = -1.0 y = 1.0 |>
+
+  I m:para 1.5 - sq 3 +
+  O |>
+
+  I D 0 4 minimize:para
+  O y = 1.5000000000000002 |>
+
+  I D 1 minimize:para
+  E While parsing minimize:para: Not Enough Stack Arguments !!
+  O y = 1.0 |>
+
+# --- Large stacks are packed below the top ---
+
+  I m:id 0 +
+  O |>
+
+  I D 0 100000 for:id
+  O ... 99990.0 99991.0 99992.0 99993.0 99994.0 99995.0 99996.0 99997.0 x = 99998.0 y = 99999.0 |>
+
+  I 99990 px 0 pv 1 ru
+  O ... 99992.0 99993.0 99994.0 99995.0 99996.0 99997.0 99998.0 99999.0 x = 1.0 y = 9.0 |>
+
+  I 3 rd rd median
+  O y = 49999.0 |>
+
+  I u
+  O ... 99992.0 99993.0 99994.0 99995.0 99996.0 99997.0 99998.0 99999.0 x = 1.0 y = 9.0 |>
+
+  I u sum
+  O y = 4999950000.0 |>
+
+  I 0 spill D 0 100000 for:id
+  O ... 99990.0 99991.0 99992.0 99993.0 99994.0 99995.0 99996.0 99997.0 x = 99998.0 y = 99999.0 |spill|>
+
+  I R
+  O ... 9.0 8.0 7.0 6.0 5.0 4.0 3.0 2.0 x = 1.0 y = 0.0 |spill|>
+
+  I median
+  O y = 50000.0 |spill|>
+
+  I u mean
+  O y = 49999.5 |spill|>
+
+  I nospill
+  O |>
+
 # --- Conditionals ---
 
   I D 1 2 > 2 1 > 2 2 >
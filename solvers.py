@@ -0,0 +1,271 @@
+#
+# Root finding, integration and minimization.
+#
+# Each works on a CachedFunction, which remembers every value it has
+# computed and counts how many that was.  Integrate() asks for all the points
+# of a round at once, so that f can compute them together.
+#
+
+import math
+import sys
+
+# Results are found to within about this much (more precisely, where that is
+# possible).
+TOLERANCE = 1e-10
+
+# Root finding and minimization give up after this many steps.
+MAX_ITERATIONS = 200
+
+# Integrate() gives up once it has split the range into this many pieces.
+MAX_INTERVALS = 5000
+
+EPSILON = sys.float_info.epsilon
+
+# The golden section step of Minimize(), as a fraction of the range.
+GOLDEN = (3 - math.sqrt(5)) / 2
+
+# Nodes and weights of the 15 point Kronrod rule, for the half [0, 1] of
+# [-1, 1].  The odd nodes are those of the 7 point Gauss rule, with weights
+# GAUSS_WEIGHTS.
+KRONROD_NODES = (
+    0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245, 0.0)
+KRONROD_WEIGHTS = (
+    0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649, 0.209482141084727828012999174891714)
+GAUSS_WEIGHTS = (
+    0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+    0.381830050505118944950369775488975, 0.417959183673469387755102040816327)
+
+
+class CachedFunction:
+  """f(x), remembering every value it returns.
+
+  many(xs), if given, returns f of each of xs in one call.  evaluations
+  counts the points computed, not those found in the cache.
+  """
+
+  def __init__(self, f, many=None):
+    self.f = f
+    self.many = many
+    self.cache = {}
+    self.evaluations = 0
+
+  def __call__(self, x):
+    if x not in self.cache:
+      self.cache[x] = _CheckValue(x, self.f(x))
+      self.evaluations += 1
+    return self.cache[x]
+
+  def Many(self, xs):
+    """Returns f of each of xs."""
+    missing = [x for x in dict.fromkeys(xs) if x not in self.cache]
+    if missing:
+      values = self.many(missing) if self.many else map(self.f, missing)
+      for x, value in zip(missing, values):
+        self.cache[x] = _CheckValue(x, value)
+      self.evaluations += len(missing)
+    return [self.cache[x] for x in xs]
+
+
+def _CheckValue(x, value):
+  if math.isnan(value):
+    raise ValueError('f(%g) is not a number' % x)
+  return value
+
+
+def FindRoot(f, a, b, tolerance=TOLERANCE):
+  """Returns (x, iterations) where f(x) is 0, for some x from a to b.
+
+  f(a) and f(b) must differ in sign.  Uses Brent's method, which takes
+  secant or inverse quadratic steps where they make progress, and bisects
+  where they don't, so it is fast but never slower than bisection.
+  """
+  fa, fb = f(a), f(b)
+  if not fa:
+    return a, 0
+  if not fb:
+    return b, 0
+  if (fa > 0) == (fb > 0):
+    raise ValueError('f(x) has the same sign at both ends of the range')
+  c, fc = b, fb
+  for iteration in range(1, MAX_ITERATIONS + 1):
+    if (fb > 0) == (fc > 0):
+      c, fc = a, fa
+      d = e = b - a
+    if abs(fc) < abs(fb):
+      a, b, c = b, c, b
+      fa, fb, fc = fb, fc, fb
+    tol = 2 * EPSILON * abs(b) + tolerance / 2
+    middle = (c - b) / 2
+    if abs(middle) <= tol or not fb:
+      return b, iteration
+    if abs(e) >= tol and abs(fa) > abs(fb):
+      p, q = _Interpolate((a, fa), (b, fb), (c, fc))
+      if 2 * p < min(3 * middle * q - abs(tol * q), abs(e * q)):
+        e, d = d, p / q
+      else:
+        d = e = middle
+    else:
+      d = e = middle
+    a, fa = b, fb
+    b += d if abs(d) > tol else math.copysign(tol, middle)
+    fb = f(b)
+  raise ValueError('no root found in %d iterations' % MAX_ITERATIONS)
+
+
+def _Interpolate(previous, best, other):
+  # Returns (p, q) for FindRoot()'s step of p / q from best, where p >= 0:
+  # a secant step if previous and other are the same point, otherwise
+  # inverse quadratic interpolation through all three.
+  (a, fa), (b, fb), (c, fc) = previous, best, other
+  s = fb / fa
+  if a == c:
+    p = (c - b) * s
+    q = 1 - s
+  else:
+    q = fa / fc
+    r = fb / fc
+    p = s * ((c - b) * q * (q - r) - (b - a) * (r - 1))
+    q = (q - 1) * (r - 1) * (s - 1)
+  if p > 0:
+    q = -q
+  return abs(p), q
+
+
+def Minimize(f, a, b, tolerance=TOLERANCE):
+  """Returns (x, iterations) where f(x) is least, for x from a to b.
+
+  Uses Brent's method: parabolic steps through the best three points so far,
+  or golden section steps where those don't help.  If f has several minima,
+  this finds one of them.
+  """
+  a, b = min(a, b), max(a, b)
+  x = a + GOLDEN * (b - a)
+  # (x, f(x)) for the least f(x) so far, the next least, and the one before.
+  points = [(x, f(x))] * 3
+  d = e = 0.0
+  for iteration in range(1, MAX_ITERATIONS + 1):
+    x, fx = points[0]
+    middle = (a + b) / 2
+    tol = math.sqrt(EPSILON) * abs(x) + tolerance / 3
+    if abs(x - middle) <= 2 * tol - (b - a) / 2:
+      return x, iteration
+    step = _ParabolicStep(points, a, b, e, tol)
+    if step is None:
+      e = (b if x < middle else a) - x
+      d = GOLDEN * e
+    else:
+      e, d = d, step
+      if x + d - a < 2 * tol or b - x - d < 2 * tol:
+        d = math.copysign(tol, middle - x)
+    u = x + (d if abs(d) >= tol else math.copysign(tol, d))
+    fu = f(u)
+    if fu <= fx:
+      a, b = (a, x) if u < x else (x, b)
+    else:
+      a, b = (u, b) if u < x else (a, u)
+    points = _AddPoint(points, (u, fu))
+  raise ValueError('no minimum found in %d iterations' % MAX_ITERATIONS)
+
+
+def _AddPoint(points, point):
+  # Returns Minimize()'s points, best first, with point (u, f(u)) in place of
+  # the one it displaces, if any.
+  (x, fx), (w, fw), (v, fv) = points
+  fu = point[1]
+  if fu <= fx:
+    return [point, (x, fx), (w, fw)]
+  if fu <= fw or w == x:
+    return [(x, fx), point, (w, fw)]
+  if fu <= fv or v in (x, w):
+    return [(x, fx), (w, fw), point]
+  return points
+
+
+def _ParabolicStep(points, a, b, e, tol):
+  # Returns Minimize()'s step from the best of points to the vertex of the
+  # parabola through them, or None if that is not a good step to take.
+  if abs(e) <= tol:
+    return None
+  (x, fx), (w, fw), (v, fv) = points
+  r = (x - w) * (fx - fv)
+  q = (x - v) * (fx - fw)
+  p = (x - v) * q - (x - w) * r
+  q = 2 * (q - r)
+  if q > 0:
+    p = -p
+  q = abs(q)
+  if abs(p) < abs(q * e / 2) and q * (a - x) < p < q * (b - x):
+    return p / q
+  return None
+
+
+def Integrate(f, a, b, tolerance=TOLERANCE):
+  """Returns (integral, rounds), the integral of f from a to b.
+
+  Each round applies the 15 point Gauss-Kronrod rule to the pieces of the
+  range new to it, with all of their points passed to f.Many() at once.  The
+  error of a piece is the difference from the 7 point Gauss rule, and until
+  those add up to little enough, any piece with more than its share of the
+  error allowed is split in two for the next round.
+  """
+  pieces = [(a, b)]
+  estimates = []  # (integral, error, low, high) of each piece
+  rounds = 0
+  while pieces:
+    rounds += 1
+    if len(estimates) + len(pieces) > MAX_INTERVALS:
+      raise ValueError('the integral did not converge')
+    estimates.extend(
+        estimate + piece for estimate, piece in zip(_Kronrod(f, pieces), pieces))
+    total = math.fsum(value for value, _, _, _ in estimates)
+    allowed = max(tolerance, tolerance * abs(total))
+    if math.fsum(error for _, error, _, _ in estimates) <= allowed:
+      break
+    estimates, pieces = _Split(estimates, allowed / len(estimates))
+  total = math.fsum(value for value, _, _, _ in estimates)
+  if not math.isfinite(total):
+    raise ValueError('the integral did not converge')
+  return total, rounds
+
+
+def _Split(estimates, share):
+  # Returns (estimates kept, pieces to estimate next) for Integrate(): each
+  # piece with more than share of the error is halved, if it still can be.
+  kept = []
+  pieces = []
+  for value, error, low, high in estimates:
+    mid = (low + high) / 2
+    if error <= share or mid in (low, high):
+      kept.append((value, error, low, high))
+    else:
+      pieces.extend(((low, mid), (mid, high)))
+  return kept, pieces
+
+
+def _Kronrod(f, pieces):
+  # Returns (integral, error) for each piece, from one call to f.Many().
+  xs = []
+  for low, high in pieces:
+    center, half = (low + high) / 2, (high - low) / 2
+    xs.extend(center - half * node for node in KRONROD_NODES)
+    xs.extend(center + half * node for node in KRONROD_NODES[:-1])
+  values = f.Many(xs)
+  size = len(KRONROD_NODES) * 2 - 1
+  results = []
+  for index, (low, high) in enumerate(pieces):
+    left = values[index * size:index * size + len(KRONROD_NODES)]
+    right = values[index * size + len(KRONROD_NODES):(index + 1) * size]
+    right.append(left[-1])  # the center, shared by both halves
+    kronrod = math.fsum(weight * (y1 + y2) for weight, y1, y2 in zip(
+        KRONROD_WEIGHTS, left, right)) - KRONROD_WEIGHTS[-1] * left[-1]
+    gauss = math.fsum(weight * (y1 + y2) for weight, y1, y2 in zip(
+        GAUSS_WEIGHTS, left[1::2], right[1::2])) - GAUSS_WEIGHTS[-1] * left[-1]
+    half = (high - low) / 2
+    results.append((kronrod * half, abs(kronrod - gauss) * abs(half)))
+  return results
@@ -0,0 +1,294 @@
+#
+# Statistics over the stack.
+#
+# Everything here takes any iterable of numbers and makes at most a few passes
+# over it, so that large stacks can be summarized quickly and without copying
+# more than they must.
+#
+
+import array
+import collections
+import itertools
+import math
+import operator
+import random
+import re
+
+# Lists up to this size are simply sorted to select from them.
+SORT_SIZE = 4096
+
+# SelectBlocks() sorts the values left in range once there are this few.
+BLOCK_SORT_SIZE = 1 << 20
+
+#
+# Sums and moments
+#
+
+def Sum(values, all_floats=None):
+  """Returns the sum of values, correctly rounded if they are all floats.
+
+  Callers that already know whether they are all floats can say so.
+  """
+  if all_floats is None:
+    all_floats = set(map(type, values)) == {float}
+  if all_floats:
+    return math.fsum(values)
+  return sum(values)
+
+
+def Mean(values, all_floats=None):
+  return Sum(values, all_floats) / len(values)
+
+
+class RunningStats:
+  """Count, mean and variance of values seen one at a time.
+
+  Uses Welford's method, which stays accurate when the mean is large compared
+  to the spread, unlike summing squares.
+  """
+
+  def __init__(self):
+    self.count = 0
+    self.mean = 0.0
+    self.m2 = 0.0  # sum of squared differences from the mean
+
+  def Add(self, value):
+    self.count += 1
+    delta = value - self.mean
+    self.mean += delta / self.count
+    self.m2 += delta * (value - self.mean)
+
+  def Extend(self, values):
+    # Add() inlined, as this runs once per value on the stack.
+    count, mean, m2 = self.count, self.mean, self.m2
+    for value in values:
+      count += 1
+      delta = value - mean
+      mean += delta / count
+      m2 += delta * (value - mean)
+    self.count, self.mean, self.m2 = count, mean, m2
+
+  def Variance(self):
+    """Returns the sample variance."""
+    if self.count < 2:
+      raise ValueError('variance needs at least two values')
+    return self.m2 / (self.count - 1)
+
+
+def Variance(values):
+  running = RunningStats()
+  running.Extend(values)
+  return running.Variance()
+
+
+def StdDev(values):
+  return math.sqrt(Variance(values))
+
+
+def Mode(values):
+  """Returns the most common value, the first one seen if there is a tie."""
+  return collections.Counter(values).most_common(1)[0][0]
+
+#
+# Selection
+#
+
+def PercentileIndex(count, percent):
+  """Returns the sorted index of the value at a percentile of count values.
+
+  This is the nearest rank at or above the percentile, so the 50th percentile
+  is the median as the median command has always defined it: the upper one
+  for an even count.
+  """
+  if not 0 <= percent <= 100:
+    raise ValueError('percentile must be from 0 to 100')
+  return min(int(count * percent / 100), count - 1)
+
+
+def Select(values, index):
+  """Returns the value at index if values were sorted, in O(n) time.
+
+  Uses Floyd and Rivest's method: two values picked from a sorted random
+  sample almost always bracket the answer closely.  One pass counts the values
+  below the lower one and keeps those in between, which are then few enough
+  to search again or sort.
+  """
+  values = values if isinstance(values, list) else list(values)
+  while len(values) > SORT_SIZE:
+    size = len(values)
+    sample = sorted(random.sample(values, int(size ** (2 / 3))))
+    position = index * len(sample) // size
+    gap = int(3 * math.sqrt(len(sample)))
+    low = sample[max(position - gap, 0)]
+    high = sample[min(position + gap, len(sample) - 1)]
+    below = sum(map(operator.lt, values, itertools.repeat(low)))
+    middle = [value for value in values if low <= value <= high]
+    if not below <= index < below + len(middle):
+      break  # an unlucky sample (or NaNs), so fall back to sorting
+    index -= below
+    if low == high:
+      return low
+    if len(middle) * 2 > size:
+      values = middle
+      break  # mostly duplicates, which sorting handles well
+    values = middle
+  return sorted(values)[index]
+
+
+def SelectBlocks(blocks, index):
+  """Like Select(), for floats too many to hold as a list.
+
+  blocks() yields the floats as arrays, and is called once per pass.  Each
+  pass counts the floats by the next 16 bits of a key that sorts like they
+  do, narrowing to the range holding the answer, until that range is small
+  enough to sort.
+  """
+  prefix = 0
+  shift = 64
+  while True:
+    shift -= 16
+    counts = [0] * 65536
+    for key in _FloatKeys(blocks):
+      if key >> (shift + 16) == prefix:
+        counts[(key >> shift) & 0xFFFF] += 1
+    for bucket, count in enumerate(counts):
+      if index < count:
+        break
+      index -= count
+    prefix = (prefix << 16) | bucket
+    if count <= BLOCK_SORT_SIZE or not shift:
+      break
+  values = [value for value, key in zip(
+      itertools.chain.from_iterable(blocks()), _FloatKeys(blocks))
+            if key >> shift == prefix]
+  values.sort()
+  return values[index]
+
+
+def _FloatKeys(blocks):
+  # Flipping the sign bit of positive floats, and all bits of negative ones,
+  # gives integers in the same order as the floats.
+  for block in blocks():
+    keys = array.array('Q')
+    keys.frombytes(block.tobytes())
+    for key in keys:
+      yield key ^ 0xFFFFFFFFFFFFFFFF if key >> 63 else key | (1 << 63)
+
+#
+# Accumulators
+#
+
+# Quantiles from an Accumulator are within this fraction of the true value.
+SKETCH_ACCURACY = 0.01
+
+
+class QuantileSketch:
+  """Approximate quantiles of a stream of floats, in bounded memory.
+
+  Values are counted in buckets whose bounds grow geometrically (as in
+  DDSketch), so a quantile is known to within SKETCH_ACCURACY of its value
+  while the number of buckets only grows with the log of the range.
+  """
+
+  def __init__(self, accuracy=SKETCH_ACCURACY):
+    self.gamma = (1 + accuracy) / (1 - accuracy)
+    self.multiplier = 1 / math.log(self.gamma)
+    self.positive = collections.Counter()  # bucket key -> count
+    self.negative = collections.Counter()  # the same, for -value
+    self.zeros = 0
+
+  def Extend(self, values):
+    positive = [value for value in values if value > 0]
+    negative = [-value for value in values if value < 0]
+    self.positive.update(map(self._Key, positive))
+    self.negative.update(map(self._Key, negative))
+    self.zeros += len(values) - len(positive) - len(negative)
+
+  def _Key(self, value):
+    return math.ceil(math.log(value) * self.multiplier)
+
+  def _Value(self, key):
+    # The middle of the bucket, in relative terms.
+    return 2 * self.gamma ** key / (self.gamma + 1)
+
+  def Select(self, index):
+    """Returns about the value at index if the values were sorted."""
+    for key in sorted(self.negative, reverse=True):
+      index -= self.negative[key]
+      if index < 0:
+        return -self._Value(key)
+    index -= self.zeros
+    if index < 0:
+      return 0.0
+    for key in sorted(self.positive):
+      index -= self.positive[key]
+      if index < 0:
+        return self._Value(key)
+    raise IndexError('sketch index out of range')
+
+
+class Accumulator:
+  """Statistics of all the values folded into it, in constant memory.
+
+  count, sum (compensated, so it stays accurate over millions of values),
+  mean and variance (Welford's) and min and max are exact.  Quantiles come
+  from a QuantileSketch.
+  """
+
+  STATS = ('count', 'sum', 'mean', 'var', 'stddev', 'min', 'max', 'median')
+
+  # The exact statistics of STATS that need something accumulated.
+  EXACT_STATS = {
+      'mean': lambda accumulator: accumulator.running.mean,
+      'var': lambda accumulator: accumulator.running.Variance(),
+      'stddev': lambda accumulator: math.sqrt(accumulator.running.Variance()),
+      'min': lambda accumulator: accumulator.min,
+      'max': lambda accumulator: accumulator.max,
+  }
+
+  def __init__(self):
+    self.running = RunningStats()
+    self.sum = 0.0
+    self.compensation = 0.0  # what rounding has lost from sum
+    self.min = None
+    self.max = None
+    self.sketch = QuantileSketch()
+
+  def Extend(self, values):
+    values = [float(value) for value in values]
+    if not all(map(math.isfinite, values)):
+      raise ValueError('accumulated values must be finite')
+    if not values:
+      return
+    self.running.Extend(values)
+    self._AddToSum(math.fsum(values))
+    low, high = min(values), max(values)
+    self.min = low if self.min is None else min(self.min, low)
+    self.max = high if self.max is None else max(self.max, high)
+    self.sketch.Extend(values)
+
+  def _AddToSum(self, value):
+    # Neumaier's compensated summation.
+    total = self.sum + value
+    if abs(self.sum) >= abs(value):
+      self.compensation += (self.sum - total) + value
+    else:
+      self.compensation += (value - total) + self.sum
+    self.sum = total
+
+  def Stat(self, name):
+    """Returns a statistic by name: one of STATS, or pN for a percentile."""
+    count = self.running.count
+    if name == 'count':
+      return count
+    if name == 'sum':
+      return self.sum + self.compensation
+    if name not in self.STATS and not re.match(r'^p[0-9.]+$', name):
+      raise ValueError('unknown statistic: %s' % name)
+    if not count:
+      raise ValueError('nothing accumulated yet')
+    if name in self.EXACT_STATS:
+      return self.EXACT_STATS[name](self)
+    percent = 50 if name == 'median' else float(name[1:])
+    value = self.sketch.Select(PercentileIndex(count, percent))
+    return min(max(value, self.min), self.max)
@@ -0,0 +1,215 @@
+#
+# Vector values for the stack.
+#
+# A Vector is one stack entry holding many numbers.  Operators apply to each
+# of them in turn, pairing up the elements of two vectors of the same length,
+# or applying a scalar to every element.  NumPy does the work when it is
+# installed, otherwise plain Python does (more slowly, but with the same
+# results).
+#
+
+import array
+import cmath
+import math
+import operator
+
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
+# Long vectors are displayed as this many elements from each end.
+DISPLAY_ITEMS = 3
+
+# Apply() and Part() names that NumPy spells differently.
+NUMPY_NAMES = {
+    'asin': 'arcsin', 'acos': 'arccos', 'atan': 'arctan', 'phase': 'angle'}
+
+# Part() functions for complex elements, without NumPy.
+PARTS = {
+    'real': operator.attrgetter('real'), 'imag': operator.attrgetter('imag'),
+    'abs': abs, 'phase': cmath.phase}
+
+
+class Vector:
+  """An immutable sequence of floats (or complex numbers).
+
+  values is a NumPy array.  Without NumPy it is a float array, or a tuple of
+  complex numbers.
+  """
+
+  __slots__ = ('values',)
+
+  def __init__(self, values):
+    if isinstance(values, array.array):
+      # Already floats, so nothing to check.
+      self.values = numpy.array(values) if numpy is not None else values
+      return
+    values = list(values)
+    if any(isinstance(value, Vector) for value in values):
+      raise TypeError('a vector can not hold vectors')
+    is_complex = any(isinstance(value, complex) for value in values)
+    if numpy is not None:
+      self.values = numpy.array(values, dtype=complex if is_complex else float)
+    elif is_complex:
+      self.values = tuple(complex(value) for value in values)
+    else:
+      self.values = array.array('d', values)
+
+  @classmethod
+  def _Wrap(cls, values):
+    # Makes a Vector from values already in the right form.
+    vector = cls.__new__(cls)
+    vector.values = values
+    return vector
+
+  def __len__(self):
+    return len(self.values)
+
+  def __iter__(self):
+    return iter(self.Items())
+
+  def Items(self):
+    """Returns the elements as a list of Python numbers."""
+    if numpy is not None:
+      return self.values.tolist()
+    return list(self.values)
+
+  def IsComplex(self):
+    if numpy is not None:
+      return numpy.iscomplexobj(self.values)
+    return any(isinstance(value, complex) for value in self.values)
+
+  @staticmethod
+  def Combine(function, x, y):
+    """Returns function(x, y) element by element, as a Vector.
+
+    Either of x and y can be a scalar, which is paired with every element of
+    the other.  function can be any operator or comparison; comparisons give
+    1.0 or 0.0.
+    """
+    x_values = x.values if isinstance(x, Vector) else x
+    y_values = y.values if isinstance(y, Vector) else y
+    if (isinstance(x, Vector) and isinstance(y, Vector)
+        and len(x_values) != len(y_values)):
+      raise ValueError('vectors must be the same length')
+    if numpy is not None:
+      try:
+        with numpy.errstate(divide='raise', invalid='raise', over='ignore'):
+          values = function(x_values, y_values)
+        if values.dtype == bool:
+          values = values.astype(float)
+        return Vector._Wrap(values)
+      except FloatingPointError:
+        pass  # so that it fails just as it would for scalars, below
+    if not isinstance(x, Vector):
+      values = [function(x, value) for value in y.Items()]
+    elif not isinstance(y, Vector):
+      values = [function(value, y) for value in x.Items()]
+    else:
+      values = list(map(function, x.Items(), y.Items()))
+    return Vector(values)
+
+  def Apply(self, name):
+    """Returns the math function name applied to each element.
+
+    As for a scalar, sqrt of a negative element is complex.  A value outside
+    the domain of another function is an error.
+    """
+    if name == 'sqrt' and not self.IsComplex() and self._AnyNegative():
+      return Vector(complex(value) for value in self.Items()).Apply(name)
+    if numpy is not None:
+      function = getattr(numpy, NUMPY_NAMES.get(name, name))
+      try:
+        with numpy.errstate(divide='raise', invalid='raise', over='ignore'):
+          return Vector._Wrap(function(self.values))
+      except FloatingPointError:
+        pass  # so that it fails just as it would for scalars, below
+    real, complex_ = getattr(math, name), getattr(cmath, name, None)
+    return Vector(complex_(value) if isinstance(value, complex) else
+                  real(value) for value in self.Items())
+
+  def Part(self, name):
+    """Returns the 'real', 'imag', 'abs' or 'phase' part of each element.
+
+    As for scalars, a vector that is not complex is its own real part and
+    magnitude, and its imaginary parts and phases are 0.
+    """
+    if not self.IsComplex():
+      return self if name in ('real', 'abs') else Vector([0.0] * len(self))
+    if numpy is not None:
+      return Vector._Wrap(getattr(numpy, NUMPY_NAMES.get(name, name))(
+          self.values))
+    return Vector(PARTS[name](value) for value in self.values)
+
+  def _AnyNegative(self):
+    if numpy is not None:
+      return bool((self.values < 0).any())
+    return any(value < 0 for value in self.values)
+
+  def Format(self, format_value):
+    """Returns the vector as text, with format_value() for each element.
+
+    Only the ends of a long vector are shown, followed by its length.
+    """
+    def Text(values):
+      return ' '.join(format_value(value) for value in Vector._Wrap(
+          values).Items())
+
+    if len(self) <= DISPLAY_ITEMS * 2:
+      return '[%s]' % Text(self.values)
+    return '[%s ... %s] (%d)' % (
+        Text(self.values[:DISPLAY_ITEMS]), Text(self.values[-DISPLAY_ITEMS:]),
+        len(self))
+
+  def __repr__(self):
+    return 'Vector(%r)' % self.Items()
+
+  def __bool__(self):
+    raise TypeError('a vector is neither true nor false')
+
+  def __neg__(self):
+    if numpy is not None:
+      return Vector._Wrap(-self.values)
+    return Vector(-value for value in self.values)
+
+  def __abs__(self):
+    if numpy is not None:
+      return Vector._Wrap(abs(self.values))
+    return Vector(abs(value) for value in self.values)
+
+  def __add__(self, other):
+    return Vector.Combine(operator.add, self, other)
+
+  def __radd__(self, other):
+    return Vector.Combine(operator.add, other, self)
+
+  def __sub__(self, other):
+    return Vector.Combine(operator.sub, self, other)
+
+  def __rsub__(self, other):
+    return Vector.Combine(operator.sub, other, self)
+
+  def __mul__(self, other):
+    return Vector.Combine(operator.mul, self, other)
+
+  def __rmul__(self, other):
+    return Vector.Combine(operator.mul, other, self)
+
+  def __truediv__(self, other):
+    return Vector.Combine(operator.truediv, self, other)
+
+  def __rtruediv__(self, other):
+    return Vector.Combine(operator.truediv, other, self)
+
+  def __pow__(self, other):
+    return Vector.Combine(operator.pow, self, other)
+
+  def __rpow__(self, other):
+    return Vector.Combine(operator.pow, other, self)
+
+  def __mod__(self, other):
+    return Vector.Combine(operator.mod, self, other)
+
+  def __rmod__(self, other):
+    return Vector.Combine(operator.mod, other, self)